@@ -1,7 +1,22 @@
 # -*- coding: utf-8 -*-
 
 import ast
-from typing import Union
+import itertools
+from typing import Any, Dict, Iterator, List, Union
+
+# Concrete expression classes, so that find_expression can use one set lookup instead of isinstance
+_EXPR_TYPES = frozenset(
+    c
+    for c in vars(ast).values()
+    if isinstance(c, type) and issubclass(c, ast.expr) and c is not ast.expr
+)
+
+# line start offsets of the source given last to extract_text_range
+_line_starts_source = None  # type: Any
+_line_starts = []  # type: List[int]
+
+# node class => whether its instances have position attributes
+_HAS_POSITION = {}  # type: Dict[type, bool]
 
 
 def extract_text_range(source, text_range):
@@ -9,20 +24,30 @@ def extract_text_range(source, text_range):
         # TODO: may be wrong encoding
         source = source.decode("utf-8")
 
-    lines = source.splitlines(True)
-    # get relevant lines
-    lines = lines[text_range.lineno - 1 : text_range.end_lineno]
+    line_starts = _get_line_starts(source)
+    # for ranges ending past the last line
+    max_index = len(line_starts) - 1
+
+    start = line_starts[min(text_range.lineno - 1, max_index)] + text_range.col_offset
+    end = line_starts[min(text_range.end_lineno - 1, max_index)] + text_range.end_col_offset
+    return source[start:end]
 
-    # trim last and first lines
-    lines[-1] = lines[-1][: text_range.end_col_offset]
-    lines[0] = lines[0][text_range.col_offset :]
-    return "".join(lines)
+
+def _get_line_starts(source):
+    # Debugger extracts many ranges from the same source
+    global _line_starts_source, _line_starts
+    if source is not _line_starts_source and source != _line_starts_source:
+        _line_starts = [0]
+        _line_starts.extend(itertools.accumulate(map(len, source.splitlines(True))))
+        _line_starts_source = source
+
+    return _line_starts
 
 
 def find_expression(start_node, text_range):
     for node in ast.walk(start_node):
         if (
-            isinstance(node, ast.expr)
+            type(node) in _EXPR_TYPES
             and node.lineno == text_range.lineno
             and node.col_offset == text_range.col_offset
             and node.end_lineno == text_range.end_lineno
@@ -41,134 +66,167 @@ def parse_source(source: bytes, filename="<unknown>", mode="exec", fallback_to_o
 
 def get_last_child(node, skip_incorrect=True):
     """Returns last focusable child expression or child statement"""
+    node_type = type(node)
+    try:
+        handler = _LAST_CHILD_HANDLERS[node_type]
+    except KeyError:
+        # resolve once per (sub)class and remember the result
+        handler = _no_last_child
+        for cls in node_type.__mro__:
+            if cls in _LAST_CHILD_HANDLERS:
+                handler = _LAST_CHILD_HANDLERS[cls]
+                break
+        _LAST_CHILD_HANDLERS[node_type] = handler
+
+    return handler(node, skip_incorrect)
+
+
+def _ok_node(node, skip_incorrect):
+    if node is None:
+        return None
 
-    def ok_node(node):
-        if node is None:
-            return None
+    assert isinstance(node, (ast.expr, ast.stmt))
 
-        assert isinstance(node, (ast.expr, ast.stmt))
+    if skip_incorrect and getattr(node, "incorrect_range", False):
+        return None
 
-        if skip_incorrect and getattr(node, "incorrect_range", False):
-            return None
+    return node
 
-        return node
 
-    def last_ok(nodes):
-        for i in range(len(nodes) - 1, -1, -1):
-            if ok_node(nodes[i]):
-                node = nodes[i]
-                if isinstance(node, ast.Starred):
-                    if ok_node(node.value):
-                        return node.value
-                    else:
-                        return None
+def _last_ok(nodes, skip_incorrect):
+    for i in range(len(nodes) - 1, -1, -1):
+        if _ok_node(nodes[i], skip_incorrect):
+            node = nodes[i]
+            if isinstance(node, ast.Starred):
+                if _ok_node(node.value, skip_incorrect):
+                    return node.value
                 else:
-                    return nodes[i]
-
-        return None
-
-    if isinstance(node, ast.Call):
-        # TODO: take care of Python 3.5 updates (Starred etc.)
-        if hasattr(node, "kwargs") and ok_node(node.kwargs):
-            return node.kwargs
-        elif hasattr(node, "starargs") and ok_node(node.starargs):
-            return node.starargs
-        else:
-            kw_values = list(map(lambda x: x.value, node.keywords))
-            last_ok_kw = last_ok(kw_values)
-            if last_ok_kw:
-                return last_ok_kw
-            elif last_ok(node.args):
-                return last_ok(node.args)
+                    return None
             else:
-                return ok_node(node.func)
+                return nodes[i]
+
+    return None
 
-    elif isinstance(node, ast.BoolOp):
-        return last_ok(node.values)
 
-    elif isinstance(node, ast.BinOp):
-        if ok_node(node.right):
-            return node.right
+def _last_child_of_call(node, skip_incorrect):
+    # TODO: take care of Python 3.5 updates (Starred etc.)
+    if hasattr(node, "kwargs") and _ok_node(node.kwargs, skip_incorrect):
+        return node.kwargs
+    elif hasattr(node, "starargs") and _ok_node(node.starargs, skip_incorrect):
+        return node.starargs
+    else:
+        kw_values = list(map(lambda x: x.value, node.keywords))
+        last_ok_kw = _last_ok(kw_values, skip_incorrect)
+        if last_ok_kw:
+            return last_ok_kw
+        elif _last_ok(node.args, skip_incorrect):
+            return _last_ok(node.args, skip_incorrect)
         else:
-            return ok_node(node.left)
+            return _ok_node(node.func, skip_incorrect)
 
-    elif isinstance(node, ast.Compare):
-        return last_ok(node.comparators)
 
-    elif isinstance(node, ast.UnaryOp):
-        return ok_node(node.operand)
+def _last_child_of_binop(node, skip_incorrect):
+    if _ok_node(node.right, skip_incorrect):
+        return node.right
+    else:
+        return _ok_node(node.left, skip_incorrect)
 
-    elif isinstance(node, (ast.Tuple, ast.List, ast.Set)):
-        return last_ok(node.elts)
 
-    elif isinstance(node, ast.Dict):
-        # TODO: actually should pairwise check last value, then last key, etc.
-        return last_ok(node.values)
+def _last_child_of_assert(node, skip_incorrect):
+    if _ok_node(node.msg, skip_incorrect):
+        return node.msg
+    else:
+        return _ok_node(node.test, skip_incorrect)
 
-    elif isinstance(
-        node, (ast.Index, ast.Return, ast.Assign, ast.AugAssign, ast.Yield, ast.YieldFrom)
-    ):
-        return ok_node(node.value)
 
-    elif isinstance(node, ast.Delete):
-        return last_ok(node.targets)
+def _last_child_of_slice(node, skip_incorrect):
+    # [:]
+    if _ok_node(node.step, skip_incorrect):
+        return node.step
+    elif _ok_node(node.upper, skip_incorrect):
+        return node.upper
+    else:
+        return _ok_node(node.lower, skip_incorrect)
 
-    elif isinstance(node, ast.Expr):
-        return ok_node(node.value)
 
-    elif isinstance(node, ast.Assert):
-        if ok_node(node.msg):
-            return node.msg
-        else:
-            return ok_node(node.test)
-
-    elif isinstance(node, ast.Slice):
-        # [:]
-        if ok_node(node.step):
-            return node.step
-        elif ok_node(node.upper):
-            return node.upper
-        else:
-            return ok_node(node.lower)
-
-    elif isinstance(node, ast.ExtSlice):
-        # [:,:]
-        for dim in reversed(node.dims):
-            result = get_last_child(dim, skip_incorrect)
-            assert result is None or isinstance(result, ast.expr)
-            if result is not None:
-                return result
-        return None
-
-    elif isinstance(node, ast.Subscript):
-        result = get_last_child(node.slice, skip_incorrect)
+def _last_child_of_ext_slice(node, skip_incorrect):
+    # [:,:]
+    for dim in reversed(node.dims):
+        result = get_last_child(dim, skip_incorrect)
+        assert result is None or isinstance(result, ast.expr)
         if result is not None:
             return result
-        else:
-            return node.value
+    return None
 
-    elif isinstance(node, ast.Raise):
-        if ok_node(node.cause):
-            return node.cause
-        elif ok_node(node.exc):
-            return node.exc
 
-    elif isinstance(node, (ast.For, ast.While, ast.If, ast.With)):
-        return True  # There is last child, but I don't know which it will be
+def _last_child_of_subscript(node, skip_incorrect):
+    result = get_last_child(node.slice, skip_incorrect)
+    if result is not None:
+        return result
+    else:
+        return node.value
 
-    # TODO: pick more cases from here:
-    """
-    (isinstance(node, (ast.IfExp, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp))
-            # or isinstance(node, ast.FunctionDef, ast.Lambda) and len(node.args.defaults) > 0
-                and (node.dest is not None or len(node.values) > 0))
 
-            #"TODO: Import ja ImportFrom"
-            # TODO: what about ClassDef ???
-    """
+def _last_child_of_raise(node, skip_incorrect):
+    if _ok_node(node.cause, skip_incorrect):
+        return node.cause
+    elif _ok_node(node.exc, skip_incorrect):
+        return node.exc
+    return None
+
 
+def _last_child_of_value(node, skip_incorrect):
+    return _ok_node(node.value, skip_incorrect)
+
+
+def _unknown_last_child(node, skip_incorrect):
+    return True  # There is last child, but I don't know which it will be
+
+
+def _no_last_child(node, skip_incorrect):
     return None
 
 
+# TODO: pick more cases from here:
+# (isinstance(node, (ast.IfExp, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp))
+#         # or isinstance(node, ast.FunctionDef, ast.Lambda) and len(node.args.defaults) > 0
+#             and (node.dest is not None or len(node.values) > 0))
+#
+#         #"TODO: Import ja ImportFrom"
+#         # TODO: what about ClassDef ???
+
+# Keyed by node class, so that get_last_child can dispatch with one lookup
+_LAST_CHILD_HANDLERS = {
+    ast.Call: _last_child_of_call,
+    ast.BoolOp: lambda node, skip_incorrect: _last_ok(node.values, skip_incorrect),
+    ast.BinOp: _last_child_of_binop,
+    ast.Compare: lambda node, skip_incorrect: _last_ok(node.comparators, skip_incorrect),
+    ast.UnaryOp: lambda node, skip_incorrect: _ok_node(node.operand, skip_incorrect),
+    ast.Tuple: lambda node, skip_incorrect: _last_ok(node.elts, skip_incorrect),
+    ast.List: lambda node, skip_incorrect: _last_ok(node.elts, skip_incorrect),
+    ast.Set: lambda node, skip_incorrect: _last_ok(node.elts, skip_incorrect),
+    # TODO: actually should pairwise check last value, then last key, etc.
+    ast.Dict: lambda node, skip_incorrect: _last_ok(node.values, skip_incorrect),
+    ast.Index: _last_child_of_value,
+    ast.Return: _last_child_of_value,
+    ast.Assign: _last_child_of_value,
+    ast.AugAssign: _last_child_of_value,
+    ast.Yield: _last_child_of_value,
+    ast.YieldFrom: _last_child_of_value,
+    ast.Delete: lambda node, skip_incorrect: _last_ok(node.targets, skip_incorrect),
+    ast.Expr: _last_child_of_value,
+    ast.Assert: _last_child_of_assert,
+    ast.Slice: _last_child_of_slice,
+    ast.ExtSlice: _last_child_of_ext_slice,
+    ast.Subscript: _last_child_of_subscript,
+    ast.Raise: _last_child_of_raise,
+    ast.For: _unknown_last_child,
+    ast.While: _unknown_last_child,
+    ast.If: _unknown_last_child,
+    ast.With: _unknown_last_child,
+}
+
+
 def mark_text_ranges(node, source: Union[bytes, str], fallback_to_one_char=False):
     """
     Node is an AST, source is corresponding source as string.
@@ -181,17 +239,24 @@ def mark_text_ranges(node, source: Union[bytes, str], fallback_to_one_char=False
         source = source.decode("utf8")
 
     ASTTokens(source, tree=node)
-    for child in ast.walk(node):
+    # nodes get their position and token attributes dynamically
+    children = ast.walk(node)  # type: Iterator[Any]
+    for child in children:
+        # position attributes are fixed per node class
+        has_position = _HAS_POSITION.get(type(child))
+        if has_position is None:
+            has_position = _HAS_POSITION[type(child)] = "lineno" in child._attributes
+
         if hasattr(child, "last_token"):
             child.end_lineno, child.end_col_offset = child.last_token.end
 
-            if hasattr(child, "lineno"):
+            if has_position:
                 # Fixes problems with some nodes like binop
                 child.lineno, child.col_offset = child.first_token.start
 
         # some nodes stay without end info
         if (
-            hasattr(child, "lineno")
+            has_position
             and (not hasattr(child, "end_lineno") or not hasattr(child, "end_col_offset"))
             and fallback_to_one_char
         ):
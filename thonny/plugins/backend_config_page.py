@@ -137,7 +137,8 @@ class BackendConfigurationPage(ConfigurationPage):
                     self.labelframe, cp_constructor
                 )
             else:
-                assert issubclass(cp_constructor, ConfigurationPage)
+                # a ConfigurationPage subclass or a function creating one
+                assert callable(cp_constructor)
                 self._conf_pages[backend_desc] = cp_constructor(self.labelframe)
 
         return self._conf_pages[backend_desc]
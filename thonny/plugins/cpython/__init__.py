@@ -1,13 +1,13 @@
+import collections
 import logging
 import os.path
 import subprocess
 import sys
-import tkinter as tk
-from tkinter import messagebox
-from tkinter import ttk
+import time
+from typing import Any, Dict, Optional, Tuple
 
 import thonny
-from thonny import get_workbench, get_runner, ui_utils, THONNY_USER_DIR, running
+from thonny import get_workbench, get_runner, ui_utils, THONNY_USER_DIR
 from thonny.common import (
     ToplevelCommand,
     InlineCommand,
@@ -15,28 +15,58 @@ from thonny.common import (
     normpath_with_actual_case,
     get_python_version_string,
     InlineResponse,
+    ToplevelResponse,
 )
 from thonny.languages import tr
 from thonny.misc_utils import running_on_windows, running_on_mac_os, running_on_linux
-from thonny.plugins.backend_config_page import BackendDetailsConfigPage
 from thonny.running import (
+    BACKEND_POLL_INTERVAL_MS,
     SubprocessProxy,
     create_frontend_python_process,
     get_interpreter_for_subprocess,
     is_bundled_python,
     WINDOWS_EXE,
 )
-from thonny.terminal import run_in_terminal
-from thonny.ui_utils import askdirectory, askopenfilename, create_string_var
 
 logger = logging.getLogger(__name__)
 
+_IS_WIN = running_on_windows()
+_IS_MAC = running_on_mac_os()
+
+# in the format used in pyvenv.cfg
+_SYS_VERSION_STRING = "%d.%d.%d" % sys.version_info[:3]
+
+# upper limit for backing off from the configured GUI update interval
+_MAX_GUI_UPDATE_INTERVAL_MS = 50
+# only this many most recently added custom interpreters are remembered
+_MAX_USED_INTERPRETERS = 32
+
+# interpreters found from standard locations, kept for the lifetime of the process
+_system_interpreters = None
+
+# normcase-d path => path with actual case
+_actual_case_paths = {}  # type: Dict[str, str]
+
+# (process, launch info) of the spare process, which a proxy destroyed by backend restart
+# has left for its successor
+_spare_from_previous_proxy = None  # type: Optional[Tuple[subprocess.Popen, Any]]
+
+# private venv path => mtime of its pyvenv.cfg when it was last found to be valid
+_checked_private_venvs = {}  # type: Dict[str, int]
+
 
 class CPythonProxy(SubprocessProxy):
     "abstract class"
 
     def __init__(self, clean: bool, executable: str) -> None:
         self._expecting_response_for_gui_update = False
+        self._gui_update_sent_time = None
+        self._configured_gui_update_interval_ms = get_workbench().get_option(
+            "run.gui_update_interval_ms"
+        )
+        self._gui_update_interval_ms = self._configured_gui_update_interval_ms
+        self._spare_proc = None
+        self._spare_proc_launch_info = None
         super().__init__(clean, executable)
         self._send_msg(ToplevelCommand("get_environment_info"))
 
@@ -56,14 +86,107 @@ class CPythonProxy(SubprocessProxy):
         if "gui_is_active" in msg:
             self._update_gui_updating(msg)
 
+        if msg.get("command_name") == "execute_system_command":
+            # Probably pip, which may have created user site dir or added packages
+            # or .pth files. Spare's sys.path was set up before that.
+            self._discard_spare_process()
+
+        if (
+            isinstance(msg, ToplevelResponse)
+            and self._spare_proc is not None
+            and self._spare_proc_launch_info != self._get_spare_process_launch_info()
+        ):
+            # Eg. %cd before Run has changed the working directory, which is given to
+            # the launcher. Replace the spare, so that the Run can still use one.
+            self._discard_spare_process()
+
+        if (
+            isinstance(msg, ToplevelResponse)
+            and self._spare_proc is None
+            and get_workbench().get_option("run.prewarm_backend")
+        ):
+            # Current process is ready and idle. Good time to prepare its replacement,
+            # so that next Run doesn't need to wait for interpreter startup.
+            self._start_spare_process()
+
     def _clear_environment(self):
         self._close_backend()
-        self._start_background_process()
+
+        if not self._promote_spare_process():
+            self._discard_spare_process()
+            self._start_background_process()
+
+    def _start_background_process(self, clean=None, extra_args=[]):
+        global _spare_from_previous_proxy
+        if _spare_from_previous_proxy is not None:
+            # backend is being restarted, maybe the spare of the previous proxy fits
+            self._spare_proc, self._spare_proc_launch_info = _spare_from_previous_proxy
+            _spare_from_previous_proxy = None
+            if not extra_args and self._promote_spare_process():
+                return
+            self._discard_spare_process()
+
+        super()._start_background_process(clean, extra_args)
+
+    def _promote_spare_process(self):
+        if (
+            self._spare_proc is not None
+            and self._spare_proc.poll() is None
+            and self._spare_proc_launch_info == self._get_spare_process_launch_info()
+        ):
+            # the spare has been blocked on reading stdin, its startup output waits in pipes
+            self._response_queue = collections.deque()
+            self._proc = self._spare_proc
+            self._spare_proc = None
+            self._spare_proc_launch_info = None
+            self._start_listening_background_process()
+            return True
+
+        return False
 
     def _close_backend(self):
         self._cancel_gui_update_loop()
+        # next process starts with a clean slate
+        self._expecting_response_for_gui_update = False
+        self._gui_update_sent_time = None
+        self._gui_update_interval_ms = self._configured_gui_update_interval_ms
         super()._close_backend()
 
+    def destroy(self):
+        global _spare_from_previous_proxy
+        if (
+            get_runner().is_restarting_backend()
+            and self._spare_proc is not None
+            and self._spare_proc.poll() is None
+        ):
+            # Stop/Restart. Leave the spare for the next proxy.
+            _discard_spare_from_previous_proxy()
+            _spare_from_previous_proxy = (self._spare_proc, self._spare_proc_launch_info)
+            self._spare_proc = None
+            self._spare_proc_launch_info = None
+
+        self._discard_spare_process()
+        super().destroy()
+
+    def _get_spare_process_launch_info(self):
+        # spare process can be used only if it would have been started the same way
+        return (self._executable, self._get_launcher_with_args(), self._get_environment())
+
+    def _start_spare_process(self):
+        try:
+            self._spare_proc = self._create_background_process()
+            self._spare_proc_launch_info = self._get_spare_process_launch_info()
+        except Exception:
+            logger.exception("Could not start spare backend process")
+            self._discard_spare_process()
+
+    def _discard_spare_process(self):
+        if self._spare_proc is not None:
+            _discard_process(self._spare_proc)
+
+        self._spare_proc = None
+        self._spare_proc_launch_info = None
+
     def get_local_executable(self):
         return self._executable
 
@@ -87,17 +210,43 @@ class CPythonProxy(SubprocessProxy):
 
     def _loop_gui_update(self, force=False):
         if force or get_runner().is_waiting_toplevel_command():
+            interval = self._gui_update_interval_ms
             # Don't send command if response for the last one hasn't arrived yet
             if not self._expecting_response_for_gui_update:
                 try:
                     self.send_command(InlineCommand("process_gui_events"))
                     self._expecting_response_for_gui_update = True
+                    self._gui_update_sent_time = time.monotonic()
                 except OSError:
                     # the backend process may have been closed already
                     # https://github.com/thonny/thonny/issues/966
                     logger.exception("Could not send process_gui_events")
+        else:
+            # the program is running and processes its events itself, no need to hurry
+            interval = max(self._gui_update_interval_ms, _MAX_GUI_UPDATE_INTERVAL_MS)
+
+        self._gui_update_loop_id = get_workbench().after(interval, self._loop_gui_update)
 
-        self._gui_update_loop_id = get_workbench().after(50, self._loop_gui_update)
+    def _register_gui_update_response(self):
+        self._expecting_response_for_gui_update = False
+        if self._gui_update_sent_time is None:
+            return
+
+        # Response is noticed only when frontend polls for messages,
+        # so the round trip includes up to one polling period
+        round_trip_ms = (time.monotonic() - self._gui_update_sent_time) * 1000
+        latency_ms = round_trip_ms - BACKEND_POLL_INTERVAL_MS
+        if latency_ms > self._gui_update_interval_ms:
+            # backend can't keep up with this rate, poll less often
+            self._gui_update_interval_ms = max(
+                min(self._gui_update_interval_ms * 2, _MAX_GUI_UPDATE_INTERVAL_MS),
+                self._configured_gui_update_interval_ms,
+            )
+        elif latency_ms <= self._configured_gui_update_interval_ms:
+            # backend is fast again, move back towards configured rate
+            self._gui_update_interval_ms = max(
+                self._gui_update_interval_ms // 2, self._configured_gui_update_interval_ms
+            )
 
     def _cancel_gui_update_loop(self):
         if self._gui_update_loop_id is not None:
@@ -110,7 +259,7 @@ class CPythonProxy(SubprocessProxy):
         import signal
 
         if self._proc is not None and self._proc.poll() is None:
-            if running_on_windows():
+            if _IS_WIN:
                 try:
                     os.kill(self._proc.pid, signal.CTRL_BREAK_EVENT)  # pylint: disable=no-member
                 except Exception:
@@ -119,6 +268,8 @@ class CPythonProxy(SubprocessProxy):
                 self._proc.send_signal(signal.SIGINT)
 
     def run_script_in_terminal(self, script_path, args, interactive, keep_open):
+        from thonny.terminal import run_in_terminal
+
         cmd = [self._executable]
         if interactive:
             cmd.append("-i")
@@ -147,7 +298,7 @@ class CPythonProxy(SubprocessProxy):
             if isinstance(msg, InlineResponse) and msg.command_name == "process_gui_events":
                 # Only wanted to know that the command was processed
                 # Don't pass upstream
-                self._expecting_response_for_gui_update = False
+                self._register_gui_update_response()
             else:
                 break
 
@@ -161,14 +312,25 @@ class PrivateVenvCPythonProxy(CPythonProxy):
 
     def _prepare_private_venv(self):
         path = get_private_venv_path()
-        if os.path.isdir(path) and os.path.isfile(os.path.join(path, "pyvenv.cfg")):
-            self._check_upgrade_private_venv(path)
+        try:
+            cfg_mtime = os.stat(os.path.join(path, "pyvenv.cfg")).st_mtime_ns
+        except OSError:
+            cfg_mtime = None
+
+        if cfg_mtime is not None and _checked_private_venvs.get(path) == cfg_mtime:
+            # already found to be fine during this session
+            return
+
+        if cfg_mtime is not None:
+            if self._check_upgrade_private_venv(path):
+                _checked_private_venvs[path] = cfg_mtime
         else:
             self._create_private_venv(
                 path, "Please wait!\nThonny prepares its virtual environment."
             )
 
     def _check_upgrade_private_venv(self, path):
+        """Returns True if the venv could be used as it is"""
         # If home is wrong then regenerate
         # If only micro version is different, then upgrade
         info = _get_venv_info(path)
@@ -182,18 +344,20 @@ class PrivateVenvCPythonProxy(CPythonProxy):
                 + "Please wait!.",
                 clear=True,
             )
+        elif info["version"] != _SYS_VERSION_STRING:
+            # venv location is specific to major and minor version
+            assert info["version"].startswith(_SYS_VERSION_STRING.rsplit(".", 1)[0] + ".")
+            self._create_private_venv(
+                path, "Please wait!\nUpgrading Thonny's virtual environment.", upgrade=True
+            )
         else:
-            venv_version = tuple(map(int, info["version"].split(".")))
-            sys_version = sys.version_info[:3]
-            assert venv_version[0] == sys_version[0]
-            assert venv_version[1] == sys_version[1]
+            return True
 
-            if venv_version[2] != sys_version[2]:
-                self._create_private_venv(
-                    path, "Please wait!\nUpgrading Thonny's virtual environment.", upgrade=True
-                )
+        return False
 
     def _create_private_venv(self, path, description, clear=False, upgrade=False):
+        _checked_private_venvs.pop(path, None)
+
         if not _check_venv_installed(self):
             return
         # Don't include system site packages
@@ -216,7 +380,7 @@ class PrivateVenvCPythonProxy(CPythonProxy):
 
         args.append(path)
 
-        proc = create_frontend_python_process(args)
+        proc = create_frontend_python_process(args, allow_posix_spawn=True)
 
         from thonny.workdlg import SubprocessDialog
 
@@ -238,16 +402,12 @@ class PrivateVenvCPythonProxy(CPythonProxy):
         bindir = os.path.dirname(get_private_venv_executable())
         # create private env marker
         marker_path = os.path.join(bindir, "is_private")
-        with open(marker_path, mode="w") as fp:
-            fp.write("# This file marks Thonny-private venv")
+        _write_small_file(marker_path, "# This file marks Thonny-private venv")
 
         # Create recommended pip conf to get rid of list deprecation warning
         # https://github.com/pypa/pip/issues/4058
-        pip_conf = "pip.ini" if running_on_windows() else "pip.conf"
-        with open(os.path.join(path, pip_conf), mode="w") as fp:
-            fp.write("[list]\nformat = columns")
-
-        assert os.path.isdir(path)
+        pip_conf = "pip.ini" if _IS_WIN else "pip.conf"
+        _write_small_file(os.path.join(path, pip_conf), "[list]\nformat = columns")
 
     @classmethod
     def get_switcher_entries(cls):
@@ -257,14 +417,17 @@ class PrivateVenvCPythonProxy(CPythonProxy):
 class SameAsFrontendCPythonProxy(CPythonProxy):
     def __init__(self, clean):
         super().__init__(clean, get_interpreter_for_subprocess())
+        if is_bundled_python(self._executable):
+            self._welcome_suffix = " (bundled)"
+        else:
+            self._welcome_suffix = " (" + self._executable + ")"
 
     def fetch_next_message(self):
         msg = super().fetch_next_message()
         if msg and "welcome_text" in msg:
-            if is_bundled_python(self._executable):
-                msg["welcome_text"] += " (bundled)"
-            else:
-                msg["welcome_text"] += " (" + self._executable + ")"
+            msg["welcome_text"] += self._welcome_suffix
+            # environment info is requested only once, no need to check following messages
+            self.fetch_next_message = super().fetch_next_message
         return msg
 
     def get_clean_description(self):
@@ -276,17 +439,25 @@ class CustomCPythonProxy(CPythonProxy):
         executable = get_workbench().get_option("CustomInterpreter.path")
 
         # Remember the usage of this non-default interpreter
-        used_interpreters = get_workbench().get_option("CustomInterpreter.used_paths")
+        used_interpreters = dict.fromkeys(
+            get_workbench().get_option("CustomInterpreter.used_paths")
+        )
         if executable not in used_interpreters:
-            used_interpreters.append(executable)
-        get_workbench().set_option("CustomInterpreter.used_paths", used_interpreters)
+            used_interpreters[executable] = None
+            get_workbench().set_option(
+                "CustomInterpreter.used_paths",
+                list(used_interpreters)[-_MAX_USED_INTERPRETERS:],
+            )
 
         super().__init__(clean, get_interpreter_for_subprocess(executable))
+        self._welcome_suffix = " (" + self._executable + ")"
 
     def fetch_next_message(self):
         msg = super().fetch_next_message()
         if msg and "welcome_text" in msg:
-            msg["welcome_text"] += " (" + self._executable + ")"
+            msg["welcome_text"] += self._welcome_suffix
+            # environment info is requested only once, no need to check following messages
+            self.fetch_next_message = super().fetch_next_message
         return msg
 
     def get_clean_description(self):
@@ -331,7 +502,7 @@ def get_private_venv_path():
 def get_private_venv_executable():
     venv_path = get_private_venv_path()
 
-    if running_on_windows():
+    if _IS_WIN:
         exe = os.path.join(venv_path, "Scripts", WINDOWS_EXE)
     else:
         exe = os.path.join(venv_path, "bin", "python3")
@@ -339,257 +510,243 @@ def get_private_venv_executable():
     return exe
 
 
-def _get_venv_info(venv_path):
-    cfg_path = os.path.join(venv_path, "pyvenv.cfg")
-    result = {}
+def _discard_process(proc):
+    if proc.poll() is None:
+        proc.kill()
 
-    with open(cfg_path, encoding="UTF-8") as fp:
-        for line in fp:
-            if "=" in line:
-                key, val = line.split("=", maxsplit=1)
-                result[key.strip()] = val.strip()
+    for stream in [proc.stdin, proc.stdout, proc.stderr]:
+        if stream is not None:
+            try:
+                stream.close()
+            except OSError:
+                pass
 
-    return result
+    proc.wait()
 
 
-class SameAsFrontEndConfigurationPage(BackendDetailsConfigPage):
-    def __init__(self, master):
-        super().__init__(master)
-        label = ttk.Label(self, text=get_interpreter_for_subprocess())
-        label.grid()
+def _discard_spare_from_previous_proxy(event=None):
+    # the new proxy didn't take it
+    global _spare_from_previous_proxy
+    if _spare_from_previous_proxy is not None:
+        _discard_process(_spare_from_previous_proxy[0])
+        _spare_from_previous_proxy = None
 
-    def should_restart(self):
-        return False
 
+def _write_small_file(path, text):
+    # without the buffering and encoding layers of a file object.
+    # O_BINARY keeps Windows from translating newlines, permissions are left to umask as with open()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        os.write(fd, text.encode("ascii"))
+    finally:
+        os.close(fd)
 
-class PrivateVenvConfigurationPage(BackendDetailsConfigPage):
-    def __init__(self, master):
-        super().__init__(master)
-        text = (
-            tr("This virtual environment is automatically maintained by Thonny.\n")
-            + tr("Location: ")
-            + get_private_venv_path()
-        )
 
-        label = ttk.Label(self, text=text)
-        label.grid()
+def _get_venv_info(venv_path):
+    cfg_path = os.path.join(venv_path, "pyvenv.cfg")
+    result = {}
 
-    def should_restart(self):
-        return False
+    with open(cfg_path, "rb") as fp:
+        data = fp.read()
 
+    for line in data.splitlines():
+        if b"=" in line:
+            key, val = line.split(b"=", maxsplit=1)
+            result[key.strip().decode("UTF-8")] = val.strip().decode("UTF-8")
 
-class CustomCPythonConfigurationPage(BackendDetailsConfigPage):
-    def __init__(self, master):
-        super().__init__(master)
+    return result
 
-        self._configuration_variable = create_string_var(
-            get_workbench().get_option("CustomInterpreter.path")
-        )
 
-        entry_label = ttk.Label(self, text=tr("Python executable"))
-        entry_label.grid(row=0, column=1, columnspan=2, sticky=tk.W)
+# Standard install locations of python.org installers in Windows
+if _IS_WIN:
+    _WIN_CANDIDATE_EXES = tuple(
+        os.path.join(dir_, WINDOWS_EXE)
+        for minor in [6, 7, 8, 9, 10]
+        for dir_ in [
+            "C:\\Python3%d" % minor,
+            "C:\\Python3%d-32" % minor,
+            "C:\\Python3%d-64" % minor,
+            "C:\\Program Files\\Python 3.%d" % minor,
+            "C:\\Program Files\\Python 3.%d-64" % minor,
+            "C:\\Program Files (x86)\\Python 3.%d" % minor,
+            "C:\\Program Files (x86)\\Python 3.%d-32" % minor,
+            os.path.expanduser("~\\AppData\\Local\\Programs\\Python\\Python3%d" % minor),
+            os.path.expanduser("~\\AppData\\Local\\Programs\\Python\\Python3%d-32" % minor),
+        ]
+    )
+    _WIN_ANACONDA_EXES = tuple(
+        os.path.join(dir_, WINDOWS_EXE)
+        for dir_ in [
+            "C:\\Anaconda3",
+            "C:\\ProgramData\\Anaconda3",
+            os.path.expanduser("~\\Anaconda3"),
+        ]
+    )
+else:
+    _WIN_CANDIDATE_EXES = ()
+    _WIN_ANACONDA_EXES = ()
+
+# common unix locations
+_UNIX_BIN_DIRS = (
+    "/bin",
+    "/usr/bin",
+    "/usr/local/bin",
+    os.path.expanduser("~/.local/bin"),
+    os.path.expanduser("~/anaconda3/bin"),
+)
+_UNIX_INTERPRETER_NAMES = frozenset(["python3", "python3.5", "python3.6", "python3.7", "python3.8"])
 
-        self._entry = ttk.Combobox(
-            self,
-            exportselection=False,
-            textvariable=self._configuration_variable,
-            values=_get_interpreters(),
-        )
+# python.org installers in macOS
+if _IS_MAC:
+    _MAC_FRAMEWORK_EXES = tuple(
+        os.path.join("/Library/Frameworks/Python.framework/Versions", version, "bin", "python3")
+        for version in ["3.6", "3.7", "3.8", "3.9"]
+    )
+else:
+    _MAC_FRAMEWORK_EXES = ()
 
-        self._entry.grid(row=1, column=1, sticky=tk.NSEW)
+# interpreter commands looked up from PATH
+_PATH_COMMANDS = ("python3", "python3.6", "python3.7", "python3.8", "python3.9")
 
-        self._select_button = ttk.Button(
-            self,
-            text="...",
-            width=3,
-            command=self._select_executable,
-        )
-        self._select_button.grid(row=1, column=2, sticky="e", padx=(10, 0))
-        self.columnconfigure(1, weight=1)
-
-        extra_text = tr("NB! Thonny only supports Python 3.5 and later")
-        if running_on_mac_os():
-            extra_text += "\n\n" + tr(
-                "NB! File selection button may not work properly when selecting executables\n"
-                + "from a virtual environment. In this case choose the 'activate' script instead\n"
-                + "of the interpreter (or enter the path directly to the box)!"
-            )
-        extra_label = ttk.Label(self, text=extra_text)
-        extra_label.grid(row=2, column=1, columnspan=2, pady=10, sticky="w")
-
-        last_row = ttk.Frame(self)
-        last_row.grid(row=100, sticky="swe", column=1, columnspan=2)
-        self.rowconfigure(100, weight=1)
-        last_row.columnconfigure(1, weight=1)
-        new_venv_link = ui_utils.create_action_label(
-            last_row,
-            "New virtual environment",
-            self._create_venv,
-        )
-        new_venv_link.grid(row=0, column=1, sticky="e", pady=10)
 
-        # self.columnconfigure(1, weight=1)
+def _get_interpreters():
+    global _system_interpreters
+    if _system_interpreters is None:
+        _system_interpreters = _find_system_interpreters()
 
-    def _select_executable(self):
-        # TODO: get dir of current interpreter
-        options = {"parent": self.winfo_toplevel()}
-        if running_on_windows():
-            options["filetypes"] = [
-                (tr("Python interpreters"), "python.exe"),
-                (tr("all files"), ".*"),
-            ]
+    result = set(_system_interpreters)
 
-        filename = askopenfilename(**options)
-        if not filename:
-            return
+    for path in get_workbench().get_option("CustomInterpreter.used_paths"):
+        if os.path.exists(path):
+            result.add(_normpath_with_actual_case_cached(path))
 
-        if filename.endswith("/activate"):
-            filename = filename[: -len("activate")] + "python3"
+    return sorted(result)
 
-        if filename:
-            self._configuration_variable.set(filename)
 
-    def _create_venv(self, event=None):
-        if not _check_venv_installed(self):
-            return
+def _normpath_with_actual_case_cached(path):
+    # Meant for existing paths only. In Windows each call queries the file system
+    # for every component of the path, but the answer doesn't change during the session.
+    key = os.path.normcase(path)
+    if key not in _actual_case_paths:
+        _actual_case_paths[key] = normpath_with_actual_case(path)
+    return _actual_case_paths[key]
 
-        messagebox.showinfo(
-            "Creating new virtual environment",
-            "After clicking 'OK' you need to choose an empty directory, "
-            "which will be the root of your new virtual environment.",
-            parent=self,
-        )
-        path = None
-        while True:
-            path = askdirectory(
-                parent=self.winfo_toplevel(),
-                initialdir=path,
-                title=tr("Select empty directory for new virtual environment"),
-            )
-            if not path:
-                return
 
-            if os.listdir(path):
-                messagebox.showerror(
-                    tr("Bad directory"),
-                    tr("Selected directory is not empty.\nSelect another or cancel."),
-                    master=self,
-                )
+def _find_commands_on_path(commands):
+    """Returns the paths shutil.which would give for given commands.
+
+    PATH is listed only once for all commands, instead of probing each
+    directory for each command separately."""
+    if _IS_WIN:
+        pathext = [ext.lower() for ext in os.environ.get("PATHEXT", "").split(os.pathsep) if ext]
+        # as in shutil.which: name -> command, preferring earlier extensions
+        wanted = {}
+        for command in commands:
+            if any(command.lower().endswith(ext) for ext in pathext):
+                wanted.setdefault(command.lower(), (command, 0))
             else:
-                break
-        assert os.path.isdir(path)
-        path = normpath_with_actual_case(path)
-
-        proc = subprocess.Popen(
-            [running.get_interpreter_for_subprocess(), "-m", "venv", path],
-            stdin=None,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-        )
-        from thonny.workdlg import SubprocessDialog
+                for i, ext in enumerate(pathext):
+                    wanted.setdefault(command.lower() + ext, (command, i))
+    else:
+        wanted = {command: (command, 0) for command in commands}
+
+    found = {}
+    seen_dirs = set()
+    for dir_ in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        normdir = os.path.normcase(dir_)
+        if not dir_ or normdir in seen_dirs:
+            continue
+        seen_dirs.add(normdir)
+
+        # command => (priority, path) of its best match in this directory
+        matches = {}
+        try:
+            with os.scandir(dir_) as entries:
+                for entry in entries:
+                    name = entry.name.lower() if _IS_WIN else entry.name
+                    if name not in wanted:
+                        continue
+                    command, priority = wanted[name]
+                    if (
+                        command not in found
+                        and (command not in matches or priority < matches[command][0])
+                        and entry.is_file()
+                        and os.access(entry.path, os.X_OK)
+                    ):
+                        matches[command] = (priority, entry.path)
+        except OSError:
+            # missing or unreadable directory
+            continue
 
-        dlg = SubprocessDialog(self, proc, tr("Creating virtual environment"), autostart=True)
-        ui_utils.show_dialog(dlg)
+        for command, (_, path) in matches.items():
+            found[command] = path
 
-        if running_on_windows():
-            exe_path = normpath_with_actual_case(os.path.join(path, "Scripts", "python.exe"))
-        else:
-            exe_path = os.path.join(path, "bin", "python3")
+        if len(found) == len(commands):
+            break
 
-        if os.path.exists(exe_path):
-            self._configuration_variable.set(exe_path)
+    return found.values()
 
-    def should_restart(self):
-        return self._configuration_variable.modified
 
-    def apply(self):
-        if not self.should_restart():
-            return
+def _forget_system_interpreters():
+    global _system_interpreters
+    _system_interpreters = None
 
-        path = self._configuration_variable.get()
-        if os.path.isfile(path):
-            get_workbench().set_option("CustomInterpreter.path", path)
 
+def _find_system_interpreters():
+    from concurrent.futures import ThreadPoolExecutor
 
-def _get_interpreters():
     result = set()
+    # existence of these is checked concurrently, because probing them one by one
+    # can be slow with cold disk cache
+    candidates = []
 
-    if running_on_windows():
-        # registry
-        result.update(_get_interpreters_from_windows_registry())
-
-        for minor in [6, 7, 8, 9, 10]:
-            for dir_ in [
-                "C:\\Python3%d" % minor,
-                "C:\\Python3%d-32" % minor,
-                "C:\\Python3%d-64" % minor,
-                "C:\\Program Files\\Python 3.%d" % minor,
-                "C:\\Program Files\\Python 3.%d-64" % minor,
-                "C:\\Program Files (x86)\\Python 3.%d" % minor,
-                "C:\\Program Files (x86)\\Python 3.%d-32" % minor,
-                "C:\\Program Files (x86)\\Python 3.%d-32" % minor,
-                os.path.expanduser("~\\AppData\Local\Programs\Python\Python3%d" % minor),
-                os.path.expanduser("~\\AppData\Local\Programs\Python\Python3%d-32" % minor),
-            ]:
-                path = os.path.join(dir_, WINDOWS_EXE)
-                if os.path.exists(path):
-                    result.add(normpath_with_actual_case(path))
-
-        # other locations
-        for dir_ in [
-            "C:\\Anaconda3",
-            "C:\\ProgramData\\Anaconda3",
-            os.path.expanduser("~\\Anaconda3"),
-        ]:
-            path = os.path.join(dir_, WINDOWS_EXE)
-            if os.path.exists(path):
-                result.add(normpath_with_actual_case(path))
+    if _IS_WIN:
+        candidates.extend(_WIN_CANDIDATE_EXES)
+        candidates.extend(_WIN_ANACONDA_EXES)
 
     else:
-        # Common unix locations
-        dirs = [
-            "/bin",
-            "/usr/bin",
-            "/usr/local/bin",
-            os.path.expanduser("~/.local/bin"),
-            os.path.expanduser("~/anaconda3/bin"),
-        ]
-        for dir_ in dirs:
+        for dir_ in _UNIX_BIN_DIRS:
             # if the dir_ is just a link to another dir_, skip it
             # (not to show items twice)
             # for example on Fedora /bin -> usr/bin
-            if not os.path.exists(dir_):
+            apath = normpath_with_actual_case(dir_)
+            if apath != dir_ and apath in _UNIX_BIN_DIRS:
                 continue
 
-            apath = normpath_with_actual_case(dir_)
-            if apath != dir_ and apath in dirs:
+            # one directory listing instead of probing each name separately
+            try:
+                with os.scandir(dir_) as entries:
+                    for entry in entries:
+                        if entry.name in _UNIX_INTERPRETER_NAMES and entry.is_file():
+                            result.add(entry.path)
+            except OSError:
+                # missing or unreadable directory
                 continue
-            for name in ["python3", "python3.5", "python3.6", "python3.7", "python3.8"]:
-                path = os.path.join(dir_, name)
-                if os.path.exists(path):
-                    result.add(path)
 
-    if running_on_mac_os():
-        for version in ["3.6", "3.7", "3.8", "3.9"]:
-            dir_ = os.path.join("/Library/Frameworks/Python.framework/Versions", version, "bin")
-            path = os.path.join(dir_, "python3")
+    candidates.extend(_MAC_FRAMEWORK_EXES)
 
-            if os.path.exists(path):
-                result.add(path)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        if _IS_WIN:
+            registry_future = executor.submit(_get_interpreters_from_windows_registry)
+        else:
+            registry_future = None
 
-    from shutil import which
+        path_commands_future = executor.submit(_find_commands_on_path, _PATH_COMMANDS)
 
-    for command in ["python3", "python3.6", "python3.7", "python3.8", "python3.9"]:
-        path = which(command)
-        if path is not None and os.path.isabs(path):
-            result.add(path)
+        for path, exists in zip(candidates, executor.map(os.path.exists, candidates)):
+            if exists:
+                if _IS_WIN:
+                    path = _normpath_with_actual_case_cached(path)
+                result.add(path)
 
-    for path in get_workbench().get_option("CustomInterpreter.used_paths"):
-        if os.path.exists(path):
-            result.add(normpath_with_actual_case(path))
+        for path in path_commands_future.result():
+            if os.path.isabs(path):
+                result.add(path)
 
-    return sorted(result)
+        if registry_future is not None:
+            result.update(registry_future.result())
+
+    return result
 
 
 def _get_interpreters_from_windows_registry():
@@ -599,35 +756,32 @@ def _get_interpreters_from_windows_registry():
 
     result = set()
     for key in [winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER]:
-        for version in [
-            "3.6",
-            "3.6-32",
-            "3.6-64",
-            "3.7",
-            "3.7-32",
-            "3.7-64",
-            "3.8",
-            "3.8-32",
-            "3.8-64",
-            "3.9",
-            "3.9-32",
-            "3.9-64",
-            "3.10",
-            "3.10-32",
-            "3.10-64",
+        for parent_subkey in [
+            "SOFTWARE\\Python\\PythonCore",
+            "SOFTWARE\\Python\\PythonCore\\Wow6432Node",
         ]:
-            for subkey in [
-                "SOFTWARE\\Python\\PythonCore\\" + version + "\\InstallPath",
-                "SOFTWARE\\Python\\PythonCore\\Wow6432Node\\" + version + "\\InstallPath",
-            ]:
-                try:
-                    dir_ = winreg.QueryValue(key, subkey)
+            try:
+                parent = winreg.OpenKey(key, parent_subkey)
+            except OSError:
+                # no Pythons registered here
+                continue
+
+            with parent:
+                # enumerate the versions actually present instead of probing all known ones
+                for i in range(winreg.QueryInfoKey(parent)[0]):
+                    version = winreg.EnumKey(parent, i)
+                    if not version.startswith("3."):
+                        continue
+
+                    try:
+                        dir_ = winreg.QueryValue(parent, version + "\\InstallPath")
+                    except OSError:
+                        continue
+
                     if dir_:
                         path = os.path.join(dir_, WINDOWS_EXE)
                         if os.path.exists(path):
                             result.add(path)
-                except Exception:
-                    pass
 
     return result
 
@@ -638,36 +792,70 @@ def _check_venv_installed(parent):
 
         return True
     except ImportError:
+        from tkinter import messagebox
+
         messagebox.showerror("Error", "Package 'venv' is not available.", parent=parent)
         return False
 
 
+def _lazy_config_page(class_name):
+    def create_page(master):
+        from thonny.plugins.cpython import config_pages
+
+        return getattr(config_pages, class_name)(master)
+
+    return create_page
+
+
+def __getattr__(name):
+    # Configuration pages are only used in the options dialog.
+    # Keep their module out of loading this plugin, which happens also on each backend start
+    # (where it saves the widget code, although tkinter itself gets imported anyway).
+    if name in [
+        "SameAsFrontEndConfigurationPage",
+        "PrivateVenvConfigurationPage",
+        "CustomCPythonConfigurationPage",
+    ]:
+        from thonny.plugins.cpython import config_pages
+
+        return getattr(config_pages, name)
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 def load_plugin():
     wb = get_workbench()
     wb.set_default("run.backend_name", "SameAsFrontend")
     wb.set_default("CustomInterpreter.used_paths", [])
     wb.set_default("CustomInterpreter.path", "")
-
-    wb.add_backend(
-        "SameAsFrontend",
-        SameAsFrontendCPythonProxy,
-        tr("The same interpreter which runs Thonny (default)"),
-        SameAsFrontEndConfigurationPage,
-        "01",
-    )
-
-    wb.add_backend(
-        "CustomCPython",
-        CustomCPythonProxy,
-        tr("Alternative Python 3 interpreter or virtual environment"),
-        CustomCPythonConfigurationPage,
-        "02",
-    )
-
-    wb.add_backend(
-        "PrivateVenv",
-        PrivateVenvCPythonProxy,
-        tr("A special virtual environment (deprecated)"),
-        PrivateVenvConfigurationPage,
-        "zz",
+    wb.set_default("run.gui_update_interval_ms", 10)
+    # Keeps one extra idle interpreter process ready for replacing the backend.
+    # Helps only Run/Debug and Stop/Restart (which hands the spare over to the new proxy).
+    # Spare process is replaced after system commands (eg. pip), but it doesn't notice
+    # packages installed outside of Thonny after it was started
+    wb.set_default("run.prewarm_backend", True)
+    wb.bind("BackendRestart", _discard_spare_from_previous_proxy, True)
+    wb.bind("WorkbenchClose", _discard_spare_from_previous_proxy, True)
+
+    wb.add_backends(
+        {
+            "SameAsFrontend": (
+                SameAsFrontendCPythonProxy,
+                tr("The same interpreter which runs Thonny (default)"),
+                _lazy_config_page("SameAsFrontEndConfigurationPage"),
+                "01",
+            ),
+            "CustomCPython": (
+                CustomCPythonProxy,
+                tr("Alternative Python 3 interpreter or virtual environment"),
+                _lazy_config_page("CustomCPythonConfigurationPage"),
+                "02",
+            ),
+            "PrivateVenv": (
+                PrivateVenvCPythonProxy,
+                tr("A special virtual environment (deprecated)"),
+                _lazy_config_page("PrivateVenvConfigurationPage"),
+                "zz",
+            ),
+        }
     )
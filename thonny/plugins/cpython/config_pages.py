@@ -0,0 +1,194 @@
+import os.path
+import subprocess
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+from thonny import get_workbench, running, ui_utils
+from thonny.common import normpath_with_actual_case
+from thonny.languages import tr
+from thonny.plugins.backend_config_page import BackendDetailsConfigPage
+from thonny.plugins.cpython import (
+    _IS_MAC,
+    _IS_WIN,
+    _check_venv_installed,
+    _forget_system_interpreters,
+    _get_interpreters,
+    get_private_venv_path,
+)
+from thonny.running import get_interpreter_for_subprocess
+from thonny.ui_utils import askdirectory, askopenfilename, create_string_var
+
+
+class SameAsFrontEndConfigurationPage(BackendDetailsConfigPage):
+    def __init__(self, master):
+        super().__init__(master)
+        label = ttk.Label(self, text=get_interpreter_for_subprocess())
+        label.grid()
+
+    def should_restart(self):
+        return False
+
+
+class PrivateVenvConfigurationPage(BackendDetailsConfigPage):
+    def __init__(self, master):
+        super().__init__(master)
+        text = (
+            tr("This virtual environment is automatically maintained by Thonny.\n")
+            + tr("Location: ")
+            + get_private_venv_path()
+        )
+
+        label = ttk.Label(self, text=text)
+        label.grid()
+
+    def should_restart(self):
+        return False
+
+
+class CustomCPythonConfigurationPage(BackendDetailsConfigPage):
+    def __init__(self, master):
+        super().__init__(master)
+
+        self._configuration_variable = create_string_var(
+            get_workbench().get_option("CustomInterpreter.path")
+        )
+
+        entry_label = ttk.Label(self, text=tr("Python executable"))
+        entry_label.grid(row=0, column=1, columnspan=2, sticky=tk.W)
+
+        self._entry = ttk.Combobox(
+            self,
+            exportselection=False,
+            textvariable=self._configuration_variable,
+            values=_get_interpreters(),
+        )
+
+        self._entry.grid(row=1, column=1, sticky=tk.NSEW)
+
+        self._select_button = ttk.Button(
+            self,
+            text="...",
+            width=3,
+            command=self._select_executable,
+        )
+        self._select_button.grid(row=1, column=2, sticky="e", padx=(10, 0))
+        self.columnconfigure(1, weight=1)
+
+        extra_text = tr("NB! Thonny only supports Python 3.5 and later")
+        if _IS_MAC:
+            extra_text += "\n\n" + tr(
+                "NB! File selection button may not work properly when selecting executables\n"
+                + "from a virtual environment. In this case choose the 'activate' script instead\n"
+                + "of the interpreter (or enter the path directly to the box)!"
+            )
+        extra_label = ttk.Label(self, text=extra_text)
+        extra_label.grid(row=2, column=1, columnspan=2, pady=10, sticky="w")
+
+        last_row = ttk.Frame(self)
+        last_row.grid(row=100, sticky="swe", column=1, columnspan=2)
+        self.rowconfigure(100, weight=1)
+        last_row.columnconfigure(1, weight=1)
+        new_venv_link = ui_utils.create_action_label(
+            last_row,
+            "New virtual environment",
+            self._create_venv,
+        )
+        new_venv_link.grid(row=0, column=1, sticky="e", pady=10)
+
+        # self.columnconfigure(1, weight=1)
+
+    def _select_executable(self):
+        # user may be looking for something installed after the interpreters were collected
+        _forget_system_interpreters()
+
+        # TODO: get dir of current interpreter
+        options = {"parent": self.winfo_toplevel()}
+        if _IS_WIN:
+            options["filetypes"] = [
+                (tr("Python interpreters"), "python.exe"),
+                (tr("all files"), ".*"),
+            ]
+
+        filename = askopenfilename(**options)
+        if not filename:
+            return
+
+        if filename.endswith("/activate"):
+            filename = filename[: -len("activate")] + "python3"
+
+        if filename:
+            self._configuration_variable.set(filename)
+
+    def _create_venv(self, event=None):
+        if not _check_venv_installed(self):
+            return
+
+        messagebox.showinfo(
+            "Creating new virtual environment",
+            "After clicking 'OK' you need to choose an empty directory, "
+            "which will be the root of your new virtual environment.",
+            parent=self,
+        )
+        path = None
+        while True:
+            path = askdirectory(
+                parent=self.winfo_toplevel(),
+                initialdir=path,
+                title=tr("Select empty directory for new virtual environment"),
+            )
+            if not path:
+                return
+
+            if os.listdir(path):
+                messagebox.showerror(
+                    tr("Bad directory"),
+                    tr("Selected directory is not empty.\nSelect another or cancel."),
+                    master=self,
+                )
+            else:
+                break
+        path = normpath_with_actual_case(path)
+
+        extra_params = {}
+        if not _IS_WIN:
+            # allows launching with posix_spawn instead of fork (see _create_python_process)
+            extra_params["close_fds"] = False
+
+        python_exe = running.get_interpreter_for_subprocess()
+        env = running.get_environment_for_python_subprocess(python_exe)
+        # SubprocessDialog decodes binary output as UTF-8
+        env["PYTHONIOENCODING"] = "utf-8"
+
+        proc = subprocess.Popen(
+            [python_exe, "-m", "venv", path],
+            stdin=None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            # SubprocessDialog reads and decodes binary output in chunks
+            universal_newlines=False,
+            env=env,
+            **extra_params,
+        )
+        from thonny.workdlg import SubprocessDialog
+
+        dlg = SubprocessDialog(self, proc, tr("Creating virtual environment"), autostart=True)
+        ui_utils.show_dialog(dlg)
+
+        if _IS_WIN:
+            exe_path = normpath_with_actual_case(os.path.join(path, "Scripts", "python.exe"))
+        else:
+            exe_path = os.path.join(path, "bin", "python3")
+
+        if os.path.exists(exe_path):
+            self._configuration_variable.set(exe_path)
+
+    def should_restart(self):
+        return self._configuration_variable.modified
+
+    def apply(self):
+        if not self.should_restart():
+            return
+
+        path = self._configuration_variable.get()
+        if os.path.isfile(path):
+            get_workbench().set_option("CustomInterpreter.path", path)
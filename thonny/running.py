@@ -74,6 +74,8 @@ logger = logging.getLogger(__name__)
 
 WINDOWS_EXE = "python.exe"
 OUTPUT_MERGE_THRESHOLD = 1000
+# how often the frontend checks for messages from the backend
+BACKEND_POLL_INTERVAL_MS = 20
 
 RUN_COMMAND_LABEL = ""  # init later when gettext is ready
 RUN_COMMAND_CAPTION = ""
@@ -101,6 +103,7 @@ class Runner:
         self._publishing_events = False
         self._polling_after_id = None
         self._postponed_commands = []  # type: List[CommandToBackend]
+        self._restarting_backend = False
 
     def _remove_obsolete_jedi_copies(self) -> None:
         # Thonny 2.1 used to copy jedi in order to make it available
@@ -234,6 +237,10 @@ class Runner:
     def is_waiting_debugger_command(self):
         return self._state == "waiting_debugger_command"
 
+    def is_restarting_backend(self):
+        """Tells whether current backend proxy is being replaced by a new one"""
+        return self._restarting_backend
+
     def get_sys_path(self) -> List[str]:
         return self._proxy.get_sys_path()
 
@@ -519,7 +526,9 @@ class Runner:
         if self._pull_backend_messages() is False:
             return
 
-        self._polling_after_id = get_workbench().after(20, self._poll_backend_messages)
+        self._polling_after_id = get_workbench().after(
+            BACKEND_POLL_INTERVAL_MS, self._poll_backend_messages
+        )
 
     def _pull_backend_messages(self):
         # Don't process too many messages in single batch, allow screen updates
@@ -598,19 +607,23 @@ class Runner:
             get_shell().restart()
             get_shell().update_idletasks()
 
-        self.destroy_backend()
-        backend_name = get_workbench().get_option("run.backend_name")
-        if backend_name not in get_workbench().get_backends():
-            raise UserError(
-                "Can't find backend '{}'. Please select another backend from options".format(
-                    backend_name
+        self._restarting_backend = True
+        try:
+            self.destroy_backend()
+            backend_name = get_workbench().get_option("run.backend_name")
+            if backend_name not in get_workbench().get_backends():
+                raise UserError(
+                    "Can't find backend '{}'. Please select another backend from options".format(
+                        backend_name
+                    )
                 )
-            )
 
-        backend_class = get_workbench().get_backends()[backend_name].proxy_class
-        self._set_state("running")
-        self._proxy = None
-        self._proxy = backend_class(clean)
+            backend_class = get_workbench().get_backends()[backend_name].proxy_class
+            self._set_state("running")
+            self._proxy = None
+            self._proxy = backend_class(clean)
+        finally:
+            self._restarting_backend = False
 
         self._poll_backend_messages()
 
@@ -903,7 +916,10 @@ class SubprocessProxy(BackendProxy):
     def _start_background_process(self, clean=None, extra_args=[]):
         # deque, because in one occasion I need to put messages back
         self._response_queue = collections.deque()
+        self._proc = self._create_background_process(extra_args)
+        self._start_listening_background_process()
 
+    def _create_background_process(self, extra_args=[]):
         if not os.path.exists(self._executable):
             raise UserError(
                 "Interpreter (%s) not found. Please recheck corresponding option!"
@@ -931,7 +947,7 @@ class SubprocessProxy(BackendProxy):
         if sys.version_info >= (3, 6):
             extra_params["encoding"] = "utf-8"
 
-        self._proc = subprocess.Popen(
+        return subprocess.Popen(
             cmd_line,
             bufsize=0,
             stdin=subprocess.PIPE,
@@ -944,6 +960,7 @@ class SubprocessProxy(BackendProxy):
             **extra_params,
         )
 
+    def _start_listening_background_process(self):
         # setup asynchronous output listeners
         self._terminated_readers = 0
         Thread(target=self._listen_stdout, args=(self._proc.stdout,), daemon=True).start()
@@ -1206,7 +1223,7 @@ def create_backend_python_process(
 
 
 def create_frontend_python_process(
-    args, stdin=None, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    args, stdin=None, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, allow_posix_spawn=False
 ):
     """Used for running helper commands (eg. for installing plug-ins on by the plug-ins)"""
     if _console_allocated:
@@ -1216,7 +1233,9 @@ def create_frontend_python_process(
     env = get_environment_for_python_subprocess(python_exe)
     env["PYTHONIOENCODING"] = "utf-8"
     env["PYTHONUNBUFFERED"] = "1"
-    return _create_python_process(python_exe, args, stdin, stdout, stderr)
+    return _create_python_process(
+        python_exe, args, stdin, stdout, stderr, allow_posix_spawn=allow_posix_spawn
+    )
 
 
 def _create_python_process(
@@ -1228,10 +1247,12 @@ def _create_python_process(
     shell=False,
     env=None,
     universal_newlines=True,
+    allow_posix_spawn=False,
 ):
 
     cmd = [python_exe] + args
 
+    extra_params = {}
     if running_on_windows():
         creationflags = subprocess.CREATE_NEW_PROCESS_GROUP
         startupinfo = subprocess.STARTUPINFO()
@@ -1239,6 +1260,10 @@ def _create_python_process(
     else:
         startupinfo = None
         creationflags = 0
+        if allow_posix_spawn:
+            # Our descriptors are non-inheritable anyway (PEP 446). Not asking to close them
+            # allows subprocess to use posix_spawn instead of forking the whole GUI process.
+            extra_params["close_fds"] = False
 
     proc = subprocess.Popen(
         cmd,
@@ -1250,6 +1275,7 @@ def _create_python_process(
         universal_newlines=universal_newlines,
         startupinfo=startupinfo,
         creationflags=creationflags,
+        **extra_params,
     )
 
     proc.cmd = cmd
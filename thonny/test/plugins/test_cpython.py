@@ -0,0 +1,55 @@
+import os
+import shutil
+import stat
+
+from thonny.plugins.cpython import _find_commands_on_path
+
+COMMANDS = ("python3", "python3.7", "python3.8", "python3.9", "missing")
+
+
+def _create_executable(dir_, name, executable=True):
+    if os.name == "nt":
+        name += ".exe"
+    path = os.path.join(str(dir_), name)
+    with open(path, "w") as fp:
+        fp.write("")
+    if executable:
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    else:
+        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+    return path
+
+
+def test_find_commands_on_path_agrees_with_which(tmp_path, monkeypatch):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    third = tmp_path / "third"
+    for dir_ in [first, second, third]:
+        dir_.mkdir()
+
+    # directory with command name doesn't count
+    (first / "python3").mkdir()
+    _create_executable(second, "python3")
+    _create_executable(third, "python3")
+
+    # later directory is used when earlier match is not executable
+    if os.name != "nt":
+        _create_executable(first, "python3.7", executable=False)
+    _create_executable(third, "python3.7")
+
+    _create_executable(second, "python3.8")
+    _create_executable(third, "python3.9")
+
+    path = os.pathsep.join(
+        [str(first), str(tmp_path / "nonexistent"), str(third), str(second), str(third), ""]
+    )
+    monkeypatch.setenv("PATH", path)
+
+    expected = {os.path.normcase(shutil.which(command) or "") for command in COMMANDS} - {""}
+    assert {os.path.normcase(path) for path in _find_commands_on_path(COMMANDS)} == expected
+    assert len(expected) == 4
+
+
+def test_find_commands_on_path_empty_path(monkeypatch):
+    monkeypatch.setenv("PATH", "")
+    assert list(_find_commands_on_path(COMMANDS)) == []
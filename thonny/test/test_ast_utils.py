@@ -0,0 +1,67 @@
+import time
+
+from thonny.ast_utils import extract_text_range
+from thonny.common import TextRange
+
+
+def _extract_text_range_with_splitlines(source, text_range):
+    # the original implementation
+    lines = source.splitlines(True)
+    lines = lines[text_range.lineno - 1 : text_range.end_lineno]
+    lines[-1] = lines[-1][: text_range.end_col_offset]
+    lines[0] = lines[0][text_range.col_offset :]
+    return "".join(lines)
+
+
+def _all_ranges(source):
+    lines = source.splitlines(True)
+    for lineno, line in enumerate(lines, 1):
+        for col_offset in range(len(line) + 1):
+            for end_lineno in range(lineno, len(lines) + 1):
+                end_line = lines[end_lineno - 1]
+                for end_col_offset in range(len(end_line) + 1):
+                    if lineno == end_lineno and end_col_offset < col_offset:
+                        continue
+                    yield TextRange(lineno, col_offset, end_lineno, end_col_offset)
+
+
+def test_extract_text_range_matches_splitlines():
+    for source in [
+        "x = 1\ny = 2\n",
+        "x = 1\ny = (2 +\n     3)",
+        "x = 1\r\ny = 2\r\nz = 3",
+        "x = 1\ry = 2\rz = 3\r",
+        "x = 1\n\x0cy = 2\n\n",
+        "x = 1\x0c\ny = 2",
+        "x = 'ä'\r\n\r\ny = 'õ'",
+    ]:
+        for text_range in _all_ranges(source):
+            assert extract_text_range(source, text_range) == _extract_text_range_with_splitlines(
+                source, text_range
+            ), (source, text_range)
+
+
+def test_extract_text_range_past_last_line():
+    assert extract_text_range("x = 1\ny = 2", TextRange(2, 0, 3, 0)) == "y = 2"
+    assert extract_text_range(b"x = 1\ny = 2", TextRange(1, 4, 3, 0)) == "1\ny = 2"
+
+
+def test_extract_text_range_large_line_numbers():
+    source = "".join(
+        "x%d = (%d +\n" % (i, i) if i % 2 == 0 else "      1)\r\n" for i in range(10000)
+    )
+    for lineno in [1, 5000, 9990, 9999]:
+        for text_range in [
+            TextRange(lineno, 0, lineno, 3),
+            TextRange(lineno, 4, lineno + 1, 7),
+            TextRange(lineno, 1, 10000, 3),
+        ]:
+            assert extract_text_range(source, text_range) == _extract_text_range_with_splitlines(
+                source, text_range
+            ), text_range
+
+    # repeated extractions from same source don't rescan it
+    start = time.perf_counter()
+    for _ in range(5000):
+        extract_text_range(source, TextRange(9990, 0, 9991, 3))
+    assert time.perf_counter() - start < 0.5
@@ -1195,6 +1195,15 @@ class Workbench(tk.Tk):
         if not getattr(config_page_constructor, "backend_name", None):
             config_page_constructor.backend_name = name
 
+    def add_backends(self, backends: Dict[str, Tuple]) -> None:
+        """Registers several backends at once.
+
+        Keys are backend names and values are tuples of remaining arguments of
+        add_backend (proxy_class, description, config_page_constructor[, sort_key]).
+        """
+        for name, args in backends.items():
+            self.add_backend(name, *args)
+
     def add_ui_theme(
         self,
         name: str,
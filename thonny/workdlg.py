@@ -1,3 +1,5 @@
+import codecs
+import io
 import logging
 import os
 import queue
@@ -356,8 +358,36 @@ class SubprocessDialog(WorkDialog):
         self._start_listening_current_proc()
 
     def _start_listening_current_proc(self):
+        def listen_binary_stream(stream_name):
+            # Read whatever is available at once, so that bursts of output reach the UI
+            # in few large chunks instead of line by line
+            stream = getattr(self._proc, stream_name)
+            decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True
+            )
+            while True:
+                chunk = os.read(stream.fileno(), 65536)
+                data = decoder.decode(chunk, final=not chunk)
+                if data:
+                    self.append_text(data, stream_name)
+                    lines = data.strip().splitlines()
+                    if lines:
+                        self._check_set_action_text_from_output_line(lines[-1])
+                if not chunk:
+                    logger.debug("Finished reading %s", stream_name)
+                    break
+
+            if stream_name == "stdout":
+                self._finish_process()
+
+            logger.debug("Returning from reading %s", stream_name)
+
         def listen_stream(stream_name):
             stream = getattr(self._proc, stream_name)
+            if not isinstance(stream, io.TextIOBase):
+                listen_binary_stream(stream_name)
+                return
+
             while True:
                 data = stream.readline()
                 self.append_text(data, stream_name)